@@ -10,12 +10,37 @@ import os
 import sys
 import subprocess
 import time
+import hashlib
+import json
+import tempfile
+import shutil
+import multiprocessing
+import threading
+import re
+import fnmatch
+from collections import Counter, defaultdict
+from operator import itemgetter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict
 import argparse
 
-@dataclass
+# Pool workers are forked so they start without re-importing this module. Each binary
+# still gets its own qemu-arm process: qemu-user has no resident mode to reuse
+POOL_CONTEXT = multiprocessing.get_context("fork")
+
+# Leading test number of a test case file name, e.g. "012_func_call.c" -> 12
+TEST_NUMBER_RE = re.compile(r"^(\d+)_")
+
+# Runtime failure descriptions by exit code; qemu reports a signal either as a negative
+# code or as the shell-style 128 + signal number
+SIGNAL_MSGS = {
+    -11: ("SIGSEGV", "Segmentation fault"), 139: ("SIGSEGV", "Segmentation fault"),
+    -6: ("SIGABRT", "Aborted"), 134: ("SIGABRT", "Aborted"),
+}
+
+@dataclass(slots=True)
 class TestResult:
     test_name: str
     frontend: str
@@ -29,318 +54,501 @@ class TestResult:
     total_time: float = 0.0
 
 class BackendTester:
-    def __init__(self, project_root: str, timeout: int = 30, frontends: List[str] = None):
+    def __init__(self, project_root: str, timeout: int = 30, frontends: List[str] = None,
+                 output_dir: str = None, keep_logs: bool = False, no_cache: bool = False,
+                 tmpfs: bool = False):
         self.project_root = Path(project_root)
         self.timeout = timeout
+        self.keep_logs = keep_logs
+        self.no_cache = no_cache
         self.frontends = frontends or ["flex_bison", "antlr4", "recursive_descent"]
         
         # Tool paths
         self.minic = self.project_root / "build" / "minic"
         self.ir_compiler = self.project_root / "tools" / "IRCompiler" / "Linux-aarch64" / "Ubuntu-22.04" / "IRCompiler"
         self.test_dir = self.project_root / "tests" / "commonclasstestcases" / "function"
-        
-        # Create output directories
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        self.output_dir = self.project_root / "test_results" / f"backend_{timestamp}"
-        for subdir in ["logs", "ir", "asm", "binary", "output", "ref_output"]:
-            (self.output_dir / subdir).mkdir(parents=True, exist_ok=True)
-        
-        print(f"Backend test output: {self.output_dir}")
-        self._check_tools()
+        self.std_c_file = self.test_dir / "std.c"
+        
+        # Reference results persist across runs, keyed by IR and input content
+        self.refcache_dir = self.project_root / "test_results" / "_refcache"
+        # Stage results persist across runs, keyed by source, input and minic build
+        self.stage_cache_dir = self.project_root / "test_results" / "_backend_cache"
+        
+        # Where results end up; differs from output_dir only for tmpfs runs
+        self.results_dir = None
+        if output_dir:
+            # Worker attached to an existing run: directories and tools already checked
+            self.output_dir = Path(output_dir)
+        else:
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            self.output_dir = self.project_root / "test_results" / f"backend_{timestamp}"
+            self.results_dir = self.output_dir
+            # Intermediate files are small and read back right away, so keep them in
+            # memory and copy only the failures to disk afterwards
+            shm = Path("/dev/shm")
+            if tmpfs and os.access(shm, os.W_OK):
+                self.output_dir = shm / f"backend_{timestamp}_{os.getpid()}"
+        
+        self.log_dir = self.output_dir / "logs"
+        self.ir_dir = self.output_dir / "ir"
+        self.asm_dir = self.output_dir / "asm"
+        self.binary_dir = self.output_dir / "binary"
+        self.run_output_dir = self.output_dir / "output"
+        self.ref_output_dir = self.output_dir / "ref_output"
+        self.std_obj = self.output_dir / "std.o"
+        
+        if not output_dir:
+            # Create output directories
+            for subdir in [self.log_dir, self.ir_dir, self.asm_dir, self.binary_dir,
+                           self.run_output_dir, self.ref_output_dir]:
+                subdir.mkdir(parents=True, exist_ok=True)
+            self.refcache_dir.mkdir(parents=True, exist_ok=True)
+            self.stage_cache_dir.mkdir(parents=True, exist_ok=True)
+            
+            print(f"Backend test output: {self.results_dir}")
+            try:
+                self._check_tools()
+            except BaseException:
+                self.finish([])
+                raise
+        
+        # IR results per (test file, frontend); the reference and the flex_bison
+        # pipeline both need the same IR, so only compile it once
+        self._ir_cache = {}
+        # Downstream stage results per (test name, IR hash), shared by the frontend
+        # threads of a test
+        self._stage_memo: Dict[Tuple[str, str], Future] = {}
+        self._stage_memo_lock = threading.Lock()
     
     def _check_tools(self):
         """Check required tools availability"""
-        tools = ["arm-linux-gnueabihf-gcc", "qemu-arm"]
-        for tool in tools:
-            try:
-                subprocess.run([tool, "--version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-            except:
+        for tool in ("arm-linux-gnueabihf-gcc", "qemu-arm"):
+            if shutil.which(tool) is None:
                 print(f"ERROR: {tool} not found. Install with: sudo apt-get install gcc-arm-linux-gnueabihf qemu-user")
                 sys.exit(1)
+        
+        # std.c is the same for every test, so build it once and only link it per test
+        cmd = ["arm-linux-gnueabihf-gcc", "-c", "-o", str(self.std_obj), str(self.std_c_file)]
+        exit_code, stdout, stderr = self.run_cmd(cmd)
+        if exit_code != 0:
+            print(f"ERROR: failed to compile {self.std_c_file}")
+            sys.stdout.write((stdout + stderr).decode(errors="replace"))
+            sys.exit(1)
     
-    def run_cmd(self, cmd: List[str], timeout: int = None, input_file: str = None, 
-                stdout_file: str = None, stderr_file: str = None) -> Tuple[int, float]:
-        """Run command with timeout"""
-        start_time = time.time()
+    def run_cmd(self, cmd: List[str], timeout: int = None,
+                input_bytes: Optional[bytes] = None) -> Tuple[int, bytes, bytes]:
+        """Run command with timeout, return (exit_code, stdout, stderr); exit_code is -999 on timeout
+        
+        input_bytes is fed on stdin; without it stdin is /dev/null so parallel
+        workers never block reading the terminal.
+        """
         timeout = timeout or self.timeout
+        stdin = subprocess.DEVNULL if input_bytes is None else None
         
-        stdout_handle = open(stdout_file, 'w') if stdout_file else subprocess.PIPE
-        stderr_handle = open(stderr_file, 'w') if stderr_file else subprocess.PIPE
+        try:
+            completed = subprocess.run(cmd, stdin=stdin, input=input_bytes, capture_output=True,
+                                       cwd=self.project_root, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            # subprocess.run has already killed and reaped the process
+            return -999, e.stdout or b"", e.stderr or b""
         
+        return completed.returncode, completed.stdout or b"", completed.stderr or b""
+    
+    def run_cmd_capture(self, cmd: List[str], timeout: int = None,
+                        input_bytes: Optional[bytes] = None) -> Tuple[int, str, str]:
+        """Run command, return (exit_code, stdout, stderr) decoded as text"""
+        exit_code, stdout, stderr = self.run_cmd(cmd, timeout, input_bytes)
+        return exit_code, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+    
+    def _spill_log(self, log_file: Path, failed: bool, stdout: bytes, stderr: bytes) -> None:
+        """Write captured output to log_file, only for failures unless keep_logs is set"""
+        if (failed or self.keep_logs) and (stdout or stderr):
+            log_file.write_bytes(stdout + stderr)
+    
+    @staticmethod
+    def _is_nonempty_file(path: Path) -> bool:
+        """Check a tool produced output with a single stat() call"""
         try:
-            if input_file:
-                with open(input_file, 'r') as f:
-                    process = subprocess.Popen(
-                        cmd,
-                        stdin=f,
-                        stdout=stdout_handle,
-                        stderr=stderr_handle,
-                        cwd=self.project_root
-                    )
-            else:
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=stdout_handle,
-                    stderr=stderr_handle,
-                    cwd=self.project_root
-                )
-            
-            try:
-                exit_code = process.wait(timeout=timeout)
-                return exit_code, time.time() - start_time
-            except subprocess.TimeoutExpired:
-                process.kill()
-                try:
-                    process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    pass
-                return -999, time.time() - start_time
-                
-        finally:
-            if stdout_file and stdout_handle != subprocess.PIPE:
-                stdout_handle.close()
-            if stderr_file and stderr_handle != subprocess.PIPE:
-                stderr_handle.close()
+            return path.stat().st_size > 0
+        except FileNotFoundError:
+            return False
     
     def compile_to_ir(self, test_file: Path, frontend: str) -> Tuple[bool, str]:
+        """Compile source to IR, reusing an earlier result for the same file and frontend"""
+        key = (str(test_file), frontend)
+        if key not in self._ir_cache:
+            self._ir_cache[key] = self._compile_to_ir(test_file, frontend)
+        return self._ir_cache[key]
+    
+    def _compile_to_ir(self, test_file: Path, frontend: str) -> Tuple[bool, str]:
         """Compile source to IR"""
         test_name = test_file.stem
-        ir_file = self.output_dir / "ir" / f"{test_name}_{frontend}.ir"
-        log_file = self.output_dir / "logs" / f"{test_name}_{frontend}_ir.log"
+        ir_file = self.ir_dir / f"{test_name}_{frontend}.ir"
+        log_file = self.log_dir / f"{test_name}_{frontend}_ir.log"
         
         frontend_flags = {"antlr4": ["-A"], "recursive_descent": ["-D"]}.get(frontend, [])
         cmd = [str(self.minic), "-S", "-I"] + frontend_flags + [str(test_file), "-o", str(ir_file)]
         
-        exit_code, _ = self.run_cmd(cmd, stdout_file=str(log_file), stderr_file=str(log_file))
+        exit_code, stdout, stderr = self.run_cmd(cmd)
+        self._spill_log(log_file, exit_code != 0, stdout, stderr)
         
-        if exit_code == 0 and ir_file.exists() and ir_file.stat().st_size > 0:
+        if exit_code == 0 and self._is_nonempty_file(ir_file):
             return True, str(ir_file)
         return False, ""
     
     def compile_to_asm(self, test_file: Path, frontend: str) -> Tuple[bool, str]:
         """Compile source to ARM assembly"""
         test_name = test_file.stem
-        asm_file = self.output_dir / "asm" / f"{test_name}_{frontend}.s"
-        log_file = self.output_dir / "logs" / f"{test_name}_{frontend}_asm.log"
+        asm_file = self.asm_dir / f"{test_name}_{frontend}.s"
+        log_file = self.log_dir / f"{test_name}_{frontend}_asm.log"
         
         frontend_flags = {"antlr4": ["-A"], "recursive_descent": ["-D"]}.get(frontend, [])
         cmd = [str(self.minic), "-S"] + frontend_flags + [str(test_file), "-o", str(asm_file)]
         
-        exit_code, _ = self.run_cmd(cmd, stdout_file=str(log_file), stderr_file=str(log_file))
+        exit_code, stdout, stderr = self.run_cmd(cmd)
+        self._spill_log(log_file, exit_code != 0, stdout, stderr)
         
-        if exit_code == 0 and asm_file.exists() and asm_file.stat().st_size > 0:
+        if exit_code == 0 and self._is_nonempty_file(asm_file):
             return True, str(asm_file)
         return False, ""
     
     def compile_asm_to_binary(self, asm_file: str, test_name: str, frontend: str) -> Tuple[bool, str]:
         """Compile assembly to binary"""
-        binary_file = self.output_dir / "binary" / f"{test_name}_{frontend}"
-        log_file = self.output_dir / "logs" / f"{test_name}_{frontend}_gcc.log"
+        binary_file = self.binary_dir / f"{test_name}_{frontend}"
+        log_file = self.log_dir / f"{test_name}_{frontend}_gcc.log"
         
-        # Add std.c for library function support
-        std_c_file = self.test_dir / "std.c"
-        cmd = ["arm-linux-gnueabihf-gcc", "-static", "-o", str(binary_file), asm_file, str(std_c_file)]
-        exit_code, _ = self.run_cmd(cmd, stdout_file=str(log_file), stderr_file=str(log_file))
+        # Link the prebuilt std.o for library function support
+        cmd = ["arm-linux-gnueabihf-gcc", "-static", "-o", str(binary_file), asm_file, str(self.std_obj)]
+        exit_code, stdout, stderr = self.run_cmd(cmd)
+        self._spill_log(log_file, exit_code != 0, stdout, stderr)
         
         if exit_code == 0 and Path(binary_file).exists():
             return True, str(binary_file)
         return False, ""
     
-    def run_binary(self, binary_file: str, test_name: str, frontend: str) -> Tuple[bool, str, int]:
-        """Run binary on qemu"""
-        output_file = self.output_dir / "output" / f"{test_name}_{frontend}.out"
-        log_file = self.output_dir / "logs" / f"{test_name}_{frontend}_run.log"
-        input_file = self.test_dir / f"{test_name}.in"
+    @staticmethod
+    def _is_runtime_success(exit_code: int) -> bool:
+        """Only timeouts (-999) and negative codes (killed by signal) are runtime failures
         
-        cmd = ["qemu-arm", binary_file]
-        
-        if input_file.exists():
-            exit_code, _ = self.run_cmd(cmd, input_file=str(input_file), 
-                                      stdout_file=str(output_file), stderr_file=str(log_file))
-        else:
-            exit_code, _ = self.run_cmd(cmd, stdout_file=str(output_file), stderr_file=str(log_file))
+        Exit codes 128-255 can be normal program return values (e.g., return -1 becomes 255).
+        """
+        return exit_code >= 0
+    
+    def run_binary(self, binary_file: str, test_name: str, frontend: str,
+                   input_bytes: Optional[bytes]) -> Tuple[bool, str, int]:
+        """Run binary on qemu, return (runtime_success, stripped stdout, exit_code)"""
+        log_file = self.log_dir / f"{test_name}_{frontend}_run.log"
         
-        output = ""
-        if output_file.exists():
-            try:
-                output = output_file.read_text().strip()
-            except:
-                pass
+        cmd = ["qemu-arm", binary_file]
+        exit_code, stdout, stderr = self.run_cmd_capture(cmd, input_bytes=input_bytes)
         
-        # Check for runtime errors (segfaults, etc.)
-        # Only negative exit codes indicate signal-based termination in subprocess
-        # Exit codes 128-255 can be normal program return values (e.g., return -1 becomes 255)
-        if exit_code == -999:
-            runtime_success = False  # Timeout
-        elif exit_code < 0:
-            runtime_success = False  # Signal-based termination (negative signal number from subprocess)
-        else:
-            runtime_success = True  # Normal exit codes (0-255 are all valid)
+        runtime_success = self._is_runtime_success(exit_code)
+        if (not runtime_success or self.keep_logs) and stderr:
+            log_file.write_text(stderr)
         
-        return runtime_success, output, exit_code
+        # The caller persists stdout only if the test fails
+        return runtime_success, stdout.strip(), exit_code
     
-    def run_reference(self, ir_file: str, test_name: str) -> Tuple[bool, str, int]:
+    def run_reference(self, ir_file: str, test_name: str,
+                      input_bytes: Optional[bytes]) -> Tuple[bool, str, int]:
         """Run reference IRCompiler"""
-        output_file = self.output_dir / "ref_output" / f"{test_name}_ref.out"
-        log_file = self.output_dir / "logs" / f"{test_name}_ref.log"
-        input_file = self.test_dir / f"{test_name}.in"
+        output_file = self.ref_output_dir / f"{test_name}_ref.out"
+        log_file = self.log_dir / f"{test_name}_ref.log"
+        
+        # Same IR and input always give the same reference result
+        ir_bytes = Path(ir_file).read_bytes()
+        key = hashlib.sha256(ir_bytes + (input_bytes or b"")).hexdigest()
+        cache_file = self.refcache_dir / f"{key}.json"
+        if not self.no_cache:
+            try:
+                cached = json.loads(cache_file.read_text())
+                return True, cached["output"], cached["exit_code"]
+            except (OSError, ValueError, KeyError):
+                pass
         
         cmd = [str(self.ir_compiler), "-R", ir_file]
+        exit_code, stdout, stderr = self.run_cmd_capture(cmd, input_bytes=input_bytes)
         
-        if input_file.exists():
-            exit_code, _ = self.run_cmd(cmd, input_file=str(input_file),
-                                      stdout_file=str(output_file), stderr_file=str(log_file))
+        runtime_success = self._is_runtime_success(exit_code)
+        output = stdout.strip()
+        if runtime_success:
+            self._write_json_atomic(cache_file, {"output": output, "exit_code": exit_code})
         else:
-            exit_code, _ = self.run_cmd(cmd, stdout_file=str(output_file), stderr_file=str(log_file))
+            output_file.write_text(stdout)
+        if (not runtime_success or self.keep_logs) and stderr:
+            log_file.write_text(stderr)
         
-        output = ""
-        if output_file.exists():
+        return runtime_success, output, exit_code
+    
+    @staticmethod
+    def _write_json_atomic(path: Path, data) -> None:
+        """Write JSON via a temp file and rename, so parallel readers never see partial files"""
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError:
             try:
-                output = output_file.read_text().strip()
-            except:
+                os.unlink(tmp_path)
+            except OSError:
                 pass
+    
+    def _read_input(self, test_name: str) -> Optional[bytes]:
+        """Read the test's .in file, None if the test takes no input"""
+        try:
+            return (self.test_dir / f"{test_name}.in").read_bytes()
+        except FileNotFoundError:
+            return None
+    
+    def _stage_cache_key(self, test_file: Path, frontend: str, input_bytes: Optional[bytes]) -> str:
+        """Key stage results by test source, input, std.c, minic build and frontend"""
+        minic_stat = self.minic.stat()
+        h = hashlib.sha256(test_file.read_bytes())
+        h.update(input_bytes or b"")
+        h.update(self.std_c_file.read_bytes())
+        h.update(f"{minic_stat.st_mtime_ns}:{minic_stat.st_size}:{frontend}".encode())
+        return h.hexdigest()
+    
+    def _stage_cache_lookup(self, key: str) -> Optional[Dict]:
+        """Return cached stage results for key, None on miss, with --no-cache or --keep-logs
         
-        # Check for runtime errors (segfaults, etc.)
-        if exit_code == -999:
-            runtime_success = False  # Timeout
-        elif exit_code < 0:
-            runtime_success = False  # Signal-based termination (negative signal number from subprocess)
-        else:
-            runtime_success = True  # Normal exit codes (0-255 are all valid)
+        A cache hit runs no tools, so it would leave no logs to keep.
+        """
+        if self.no_cache or self.keep_logs:
+            return None
+        try:
+            return json.loads((self.stage_cache_dir / f"{key}.json").read_text())
+        except (OSError, ValueError):
+            return None
+    
+    def _stage_cache_store(self, key: str, stages: Dict) -> None:
+        """Save stage results for key; one file per key, so parallel workers never contend"""
+        self._write_json_atomic(self.stage_cache_dir / f"{key}.json", stages)
+    
+    def _run_stages(self, test_file: Path, frontend: str, input_bytes: Optional[bytes]) -> Dict:
+        """Run IR -> ASM -> binary -> qemu, return the outcome of each stage
         
-        return runtime_success, output, exit_code
+        "error"/"status" are set when the pipeline stopped before the reference comparison.
+        """
+        test_name = test_file.stem
+        stages = {"ir_ok": False, "asm_ok": False, "binary_ok": False, "runtime_ok": False,
+                  "output": "", "exit": None, "error": None, "status": None}
+        
+        # Step 1: Compile to IR
+        ir_success, ir_file = self.compile_to_ir(test_file, frontend)
+        stages["ir_ok"] = ir_success
+        if not ir_success:
+            stages["error"], stages["status"] = "IR compilation failed", "IR FAILED"
+            return stages
+        
+        # Frontends that produce byte-identical IR get identical assembly, binary and
+        # run results, so only the first one runs the remaining stages
+        ir_hash = hashlib.sha256(Path(ir_file).read_bytes()).hexdigest()
+        memo_key = (test_name, ir_hash)
+        with self._stage_memo_lock:
+            pending = self._stage_memo.get(memo_key)
+            if pending is None:
+                pending = self._stage_memo[memo_key] = Future()
+                owner = True
+            else:
+                owner = False
+        
+        if not owner:
+            stages.update(pending.result())
+            if stages["asm_ok"] and stages["binary_ok"] and not stages["runtime_ok"]:
+                (self.run_output_dir / f"{test_name}_{frontend}.out").write_text(stages["output"])
+            return stages
+        
+        try:
+            stages.update(self._run_backend_stages(test_file, frontend, input_bytes))
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        pending.set_result({k: v for k, v in stages.items() if k != "ir_ok"})
+        return stages
     
-    def test_single_file(self, test_file: Path) -> List[TestResult]:
-        """Test single file with all frontends"""
+    def _run_backend_stages(self, test_file: Path, frontend: str, input_bytes: Optional[bytes]) -> Dict:
+        """Run ASM -> binary -> qemu for a frontend whose IR compiled"""
         test_name = test_file.stem
-        results = []
+        stages = {}
+        
+        # Step 2: Compile to ASM
+        asm_success, asm_file = self.compile_to_asm(test_file, frontend)
+        stages["asm_ok"] = asm_success
+        if not asm_success:
+            stages["error"], stages["status"] = "ASM generation failed", "ASM FAILED"
+            return stages
+        
+        # Step 3: Compile to binary
+        binary_success, binary_file = self.compile_asm_to_binary(asm_file, test_name, frontend)
+        stages["binary_ok"] = binary_success
+        if not binary_success:
+            stages["error"], stages["status"] = "Binary compilation failed", "BINARY FAILED"
+            return stages
+        
+        # Step 4: Run binary
+        runtime_success, output, exit_code = self.run_binary(binary_file, test_name, frontend, input_bytes)
+        stages["runtime_ok"] = runtime_success
+        stages["output"] = output
+        stages["exit"] = exit_code
+        if not runtime_success:
+            (self.run_output_dir / f"{test_name}_{frontend}.out").write_text(output)
+            if exit_code == -999:
+                stages["error"] = "Runtime timeout"
+                stages["status"] = "RUNTIME TIMEOUT"
+            elif exit_code in SIGNAL_MSGS:
+                name, description = SIGNAL_MSGS[exit_code]
+                stages["error"] = f"{description} ({name})"
+                stages["status"] = f"RUNTIME FAILED ({name})"
+            elif exit_code < 0:
+                signal_num = -exit_code
+                stages["error"] = f"Runtime error (signal {signal_num})"
+                stages["status"] = f"RUNTIME FAILED (SIG{signal_num})"
+            else:
+                stages["error"] = f"Runtime error (exit code {exit_code})"
+                stages["status"] = f"RUNTIME FAILED ({exit_code})"
+        return stages
+    
+    def _test_one_frontend(self, test_file: Path, frontend: str, input_bytes: Optional[bytes],
+                           reference_output: Optional[str],
+                           reference_exit: Optional[int]) -> Tuple[TestResult, str]:
+        """Run the full pipeline for one frontend, return (result, log line)"""
+        test_name = test_file.stem
+        start_time = time.perf_counter()
+        result = TestResult(test_name, frontend, False, False, False, False, False, False)
+        line = f"  {frontend}: "
+        
+        # Unchanged source, input and minic give the same stage results
+        key = self._stage_cache_key(test_file, frontend, input_bytes)
+        stages = self._stage_cache_lookup(key)
+        cached = stages is not None
+        if not cached:
+            stages = self._run_stages(test_file, frontend, input_bytes)
+        
+        result.ir_success = stages["ir_ok"]
+        result.asm_success = stages["asm_ok"]
+        result.binary_success = stages["binary_ok"]
+        result.runtime_success = stages["runtime_ok"]
+        if stages["status"] is not None:
+            result.error_message = stages["error"]
+            result.total_time = time.perf_counter() - start_time
+            return result, line + stages["status"]
+        
+        # Step 5: Compare with reference
+        output, exit_code = stages["output"], stages["exit"]
+        if reference_output is not None and reference_exit is not None:
+            result.output_matches = (output == reference_output)
+            result.exit_code_matches = (exit_code == reference_exit)
+            if result.output_matches and result.exit_code_matches:
+                status = "OK"
+            else:
+                status = "OUTPUT MISMATCH"
+                result.error_message = "Output or exit code mismatch"
+                (self.run_output_dir / f"{test_name}_{frontend}.out").write_text(output)
+        else:
+            result.output_matches = True
+            result.exit_code_matches = True
+            status = "OK (no reference)"
         
-        print(f"Testing {test_name}...")
+        # Only clean pipelines are cached: failures run again so their logs and
+        # artifacts stay inspectable
+        if not cached and result.output_matches and result.exit_code_matches:
+            self._stage_cache_store(key, stages)
         
-        # Get reference output using flex_bison
-        reference_output, reference_exit = None, None
-        if "flex_bison" in self.frontends:
-            ir_success, ir_file = self.compile_to_ir(test_file, "flex_bison")
-            if ir_success:
-                ref_success, ref_output, ref_exit = self.run_reference(ir_file, test_name)
-                if ref_success:
-                    reference_output, reference_exit = ref_output, ref_exit
+        result.total_time = time.perf_counter() - start_time
+        return result, line + status
+    
+    def compute_reference(self, test_file: Path) -> Optional[Tuple[str, int]]:
+        """Get reference (output, exit_code) using flex_bison IR, None if unavailable"""
+        if "flex_bison" not in self.frontends:
+            return None
+        ir_success, ir_file = self.compile_to_ir(test_file, "flex_bison")
+        if not ir_success:
+            return None
+        input_bytes = self._read_input(test_file.stem)
+        ref_success, ref_output, ref_exit = self.run_reference(ir_file, test_file.stem, input_bytes)
+        if not ref_success:
+            return None
+        return ref_output, ref_exit
+    
+    def _worker_args(self) -> Dict:
+        """Plain keyword arguments for rebuilding this tester inside a pool worker"""
+        return {"project_root": str(self.project_root), "output_dir": str(self.output_dir),
+                "timeout": self.timeout, "frontends": self.frontends,
+                "keep_logs": self.keep_logs, "no_cache": self.no_cache}
+    
+    def test_single_file(self, test_file: Path,
+                         reference: Optional[Tuple[str, int]] = None) -> Tuple[List[TestResult], List[str]]:
+        """Test single file with all frontends against a precomputed reference, return (results, log lines)"""
+        test_name = test_file.stem
+        log = [f"Testing {test_name}..."]
+        reference_output, reference_exit = reference if reference is not None else (None, None)
+        # Read once and share the bytes with every frontend's run
+        input_bytes = self._read_input(test_name)
+        
+        # Frontends only share the reference and stage results for identical IR,
+        # so run them concurrently; threads suffice since the work is waiting on subprocesses
+        finished = {}
+        with ThreadPoolExecutor(max_workers=len(self.frontends)) as executor:
+            futures = [executor.submit(self._test_one_frontend, test_file, frontend, input_bytes,
+                                       reference_output, reference_exit)
+                       for frontend in self.frontends]
+            for future in as_completed(futures):
+                result, line = future.result()
+                finished[result.frontend] = (result, line)
         
-        # Test each frontend
+        results = []
         for frontend in self.frontends:
-            start_time = time.time()
-            result = TestResult(test_name, frontend, False, False, False, False, False, False)
-            
-            print(f"  {frontend}: ", end="", flush=True)
-            
-            # Step 1: Compile to IR
-            ir_success, ir_file = self.compile_to_ir(test_file, frontend)
-            result.ir_success = ir_success
-            if not ir_success:
-                result.error_message = "IR compilation failed"
-                print("IR FAILED")
-                result.total_time = time.time() - start_time
-                results.append(result)
-                continue
-            
-            # Step 2: Compile to ASM
-            asm_success, asm_file = self.compile_to_asm(test_file, frontend)
-            result.asm_success = asm_success
-            if not asm_success:
-                result.error_message = "ASM generation failed"
-                print("ASM FAILED")
-                result.total_time = time.time() - start_time
-                results.append(result)
-                continue
-            
-            # Step 3: Compile to binary
-            binary_success, binary_file = self.compile_asm_to_binary(asm_file, test_name, frontend)
-            result.binary_success = binary_success
-            if not binary_success:
-                result.error_message = "Binary compilation failed"
-                print("BINARY FAILED")
-                result.total_time = time.time() - start_time
-                results.append(result)
-                continue
-            
-            # Step 4: Run binary
-            runtime_success, output, exit_code = self.run_binary(binary_file, test_name, frontend)
-            result.runtime_success = runtime_success
-            if not runtime_success:
-                if exit_code == -999:
-                    result.error_message = "Runtime timeout"
-                    print("RUNTIME TIMEOUT")
-                elif exit_code == -11 or exit_code == 139:  # SIGSEGV
-                    result.error_message = "Segmentation fault (SIGSEGV)"
-                    print("RUNTIME FAILED (SIGSEGV)")
-                elif exit_code == -6 or exit_code == 134:  # SIGABRT
-                    result.error_message = "Aborted (SIGABRT)"
-                    print("RUNTIME FAILED (SIGABRT)")
-                elif exit_code < 0:
-                    signal_num = -exit_code
-                    result.error_message = f"Runtime error (signal {signal_num})"
-                    print(f"RUNTIME FAILED (SIG{signal_num})")
-                else:
-                    result.error_message = f"Runtime error (exit code {exit_code})"
-                    print(f"RUNTIME FAILED ({exit_code})")
-                result.total_time = time.time() - start_time
-                results.append(result)
-                continue
-            
-            # Step 5: Compare with reference
-            if reference_output is not None and reference_exit is not None:
-                result.output_matches = (output == reference_output)
-                result.exit_code_matches = (exit_code == reference_exit)
-                if result.output_matches and result.exit_code_matches:
-                    print("OK")
-                else:
-                    print("OUTPUT MISMATCH")
-                    result.error_message = "Output or exit code mismatch"
-            else:
-                result.output_matches = True
-                result.exit_code_matches = True
-                print("OK (no reference)")
-            
-            result.total_time = time.time() - start_time
+            result, line = finished[frontend]
             results.append(result)
-        
-        return results
+            log.append(line)
+        return results, log
     
     def run_tests(self, pattern: str = "*.c", max_tests: int = None) -> List[TestResult]:
         """Run tests on matching files"""
-        test_files = list(self.test_dir.glob(pattern))
-        
-        # Filter and sort test files
-        filtered_files = []
-        for test_file in test_files:
-            if test_file.name.startswith(('std.', 'minicrun', 'readme')):
-                continue
-            try:
-                # Extract test number for sorting
-                test_number = int(test_file.name.split('_')[0])
-                if test_number <= 143:  # Basic tests only for now
-                    filtered_files.append((test_number, test_file))
-            except:
-                continue
-        
-        test_files = [f for _, f in sorted(filtered_files)]
+        # Filter and sort test files in a single directory pass
+        candidates = []
+        with os.scandir(self.test_dir) as it:
+            for entry in it:
+                if not fnmatch.fnmatch(entry.name, pattern) or entry.name.startswith(('std.', 'minicrun', 'readme')):
+                    continue
+                match = TEST_NUMBER_RE.match(entry.name)
+                if match:
+                    test_number = int(match.group(1))
+                    if test_number <= 143:  # Basic tests only for now
+                        candidates.append((test_number, entry.name, entry.path))
+        
+        candidates.sort(key=itemgetter(0, 1))
+        test_files = [Path(path) for _, _, path in candidates]
         if max_tests:
             test_files = test_files[:max_tests]
         
         print(f"Found {len(test_files)} test files")
         
         all_results = []
-        for i, test_file in enumerate(test_files, 1):
-            print(f"[{i}/{len(test_files)}] ", end="")
+        max_workers = max(1, (os.cpu_count() or 1) - 2)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=POOL_CONTEXT) as executor:
+            futures = {
+                executor.submit(_test_file_worker, self._worker_args(), test_file): test_file
+                for test_file in test_files
+            }
             try:
-                results = self.test_single_file(test_file)
-                all_results.extend(results)
+                for i, future in enumerate(as_completed(futures), 1):
+                    test_file = futures[future]
+                    try:
+                        results, log = future.result()
+                        print(f"[{i}/{len(test_files)}] " + "\n".join(log))
+                        all_results.extend(results)
+                    except Exception as e:
+                        print(f"[{i}/{len(test_files)}] ERROR: {test_file.name}: {e}")
             except KeyboardInterrupt:
-                print(f"Interrupted at {test_file.name}")
-                break
-            except Exception as e:
-                print(f"ERROR: {e}")
+                print("Interrupted, cancelling pending tests")
+                executor.shutdown(wait=False, cancel_futures=True)
         
+        # Workers finish out of order; report in test order
+        order = {f.stem: i for i, f in enumerate(test_files)}
+        all_results.sort(key=lambda r: order[r.test_name])
         return all_results
     
     def print_summary(self, results: List[TestResult]):
@@ -349,38 +557,37 @@ class BackendTester:
         print("BACKEND TEST SUMMARY")
         print("="*70)
         
+        # Tally every metric and collect failures in a single pass
+        counts = defaultdict(Counter)
+        failures = []
+        for r in results:
+            full = self._is_full_success(r)
+            c = counts[r.frontend]
+            c["total"] += 1
+            c["ir"] += r.ir_success
+            c["asm"] += r.asm_success
+            c["binary"] += r.binary_success
+            c["runtime"] += r.runtime_success
+            c["output"] += r.output_matches
+            c["exit"] += r.exit_code_matches
+            c["full"] += full
+            if not full:
+                failures.append(r)
+        
         for frontend in self.frontends:
-            frontend_results = [r for r in results if r.frontend == frontend]
-            if not frontend_results:
+            c = counts.get(frontend)
+            if not c:
                 continue
             
-            total = len(frontend_results)
-            ir_ok = sum(1 for r in frontend_results if r.ir_success)
-            asm_ok = sum(1 for r in frontend_results if r.asm_success)
-            binary_ok = sum(1 for r in frontend_results if r.binary_success)
-            runtime_ok = sum(1 for r in frontend_results if r.runtime_success)
-            output_ok = sum(1 for r in frontend_results if r.output_matches)
-            exit_ok = sum(1 for r in frontend_results if r.exit_code_matches)
-            full_ok = sum(1 for r in frontend_results if all([
-                r.ir_success, r.asm_success, r.binary_success, 
-                r.runtime_success, r.output_matches, r.exit_code_matches
-            ]))
-            
+            total = c["total"]
             print(f"\n{frontend.upper()}:")
-            print(f"  IR generation:      {ir_ok:3d}/{total} ({100*ir_ok/total:5.1f}%)")
-            print(f"  ASM generation:     {asm_ok:3d}/{total} ({100*asm_ok/total:5.1f}%)")
-            print(f"  Binary compilation: {binary_ok:3d}/{total} ({100*binary_ok/total:5.1f}%)")
-            print(f"  Runtime success:    {runtime_ok:3d}/{total} ({100*runtime_ok/total:5.1f}%)")
-            print(f"  Output matches:     {output_ok:3d}/{total} ({100*output_ok/total:5.1f}%)")
-            print(f"  Exit code matches:  {exit_ok:3d}/{total} ({100*exit_ok/total:5.1f}%)")
-            print(f"  FULL SUCCESS:       {full_ok:3d}/{total} ({100*full_ok/total:5.1f}%)")
+            for label, metric in [("IR generation:     ", "ir"), ("ASM generation:    ", "asm"),
+                                  ("Binary compilation:", "binary"), ("Runtime success:   ", "runtime"),
+                                  ("Output matches:    ", "output"), ("Exit code matches: ", "exit"),
+                                  ("FULL SUCCESS:      ", "full")]:
+                print(f"  {label} {c[metric]:3d}/{total} ({100*c[metric]/total:5.1f}%)")
         
         # Show failures
-        failures = [r for r in results if not all([
-            r.ir_success, r.asm_success, r.binary_success, 
-            r.runtime_success, r.output_matches, r.exit_code_matches
-        ])]
-        
         if failures:
             print(f"\nFAILURES ({len(failures)}):")
             for result in failures[:20]:  # Show first 20 failures
@@ -390,7 +597,43 @@ class BackendTester:
         else:
             print("\nNo failures!")
         
-        print(f"\nResults saved in: {self.output_dir}")
+        print(f"\nResults saved in: {self.results_dir or self.output_dir}")
+    
+    @staticmethod
+    def _is_full_success(r: TestResult) -> bool:
+        return all([r.ir_success, r.asm_success, r.binary_success,
+                    r.runtime_success, r.output_matches, r.exit_code_matches])
+    
+    def finish(self, results: List[TestResult]) -> None:
+        """For tmpfs runs, copy artifacts of failing tests to results_dir and drop the tmpfs tree
+        
+        Called even when the run was interrupted, so the tree never outlives the process.
+        """
+        if self.results_dir is None or self.results_dir == self.output_dir:
+            return
+        try:
+            failures = [r for r in results if not self._is_full_success(r)]
+            prefixes = tuple({f"{r.test_name}_{r.frontend}" for r in failures} |
+                             {f"{r.test_name}_ref" for r in failures})
+            for subdir in [self.log_dir, self.ir_dir, self.asm_dir, self.binary_dir,
+                           self.run_output_dir, self.ref_output_dir]:
+                dest = self.results_dir / subdir.name
+                dest.mkdir(parents=True, exist_ok=True)
+                with os.scandir(subdir) as it:
+                    for entry in it:
+                        if entry.name.startswith(prefixes):
+                            shutil.copy2(entry.path, dest / entry.name)
+        finally:
+            shutil.rmtree(self.output_dir, ignore_errors=True)
+
+def _test_file_worker(tester_args: Dict, test_file: Path) -> Tuple[List[TestResult], List[str]]:
+    """Process pool entry point: test one file with a tester attached to an existing run
+    
+    The reference is computed by the same tester, so its flex_bison IR is compiled once
+    and reused by the flex_bison pipeline.
+    """
+    tester = BackendTester(**tester_args)
+    return tester.test_single_file(test_file, tester.compute_reference(test_file))
 
 def main():
     parser = argparse.ArgumentParser(description="Test minic backend (ARM assembly generation)")
@@ -402,6 +645,12 @@ def main():
     parser.add_argument("--pattern", default="*.c", help="Test file pattern")
     parser.add_argument("--timeout", type=int, default=30, help="Timeout per operation")
     parser.add_argument("--test-files", nargs="+", help="Specific test files")
+    parser.add_argument("--keep-logs", action="store_true",
+                       help="Write tool logs for passing stages too (default: failures only)")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Ignore cached reference and stage results from earlier runs")
+    parser.add_argument("--tmpfs", action="store_true",
+                       help="Keep intermediate files in /dev/shm and save only failures to disk")
     
     args = parser.parse_args()
     
@@ -424,15 +673,17 @@ def main():
         sys.exit(1)
     
     # Run tests
-    tester = BackendTester(str(project_root), args.timeout, args.frontends)
+    tester = BackendTester(str(project_root), args.timeout, args.frontends,
+                           keep_logs=args.keep_logs, no_cache=args.no_cache, tmpfs=args.tmpfs)
     
+    all_results = []
     try:
         if args.test_files:
-            all_results = []
             for test_file_name in args.test_files:
                 test_file = test_dir / test_file_name
                 if test_file.exists():
-                    results = tester.test_single_file(test_file)
+                    results, log = tester.test_single_file(test_file, tester.compute_reference(test_file))
+                    print("\n".join(log))
                     all_results.extend(results)
                 else:
                     print(f"WARNING: {test_file_name} not found")
@@ -444,6 +695,8 @@ def main():
     except KeyboardInterrupt:
         print("\nInterrupted by user")
         sys.exit(1)
+    finally:
+        tester.finish(all_results)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -12,12 +12,38 @@ import subprocess
 import tempfile
 import shutil
 import time
+import bisect
+import fnmatch
+import hashlib
+import json
+import fcntl
+import selectors
+import threading
+import multiprocessing
+import re
+from collections import Counter, defaultdict
+from operator import itemgetter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional, List, Tuple
-import argparse
+from typing import Optional, List, Tuple, Dict
 
-@dataclass
+# Pool workers are forked so they start without re-importing this module. IRCompiler has
+# no mode for running several IR files, so each run still launches its own process
+POOL_CONTEXT = multiprocessing.get_context("fork")
+
+# Popen launches through os.posix_spawn only without cwd and with close_fds off; every
+# fd this script opens is non-inheritable, and tools and files are passed as absolute
+# paths under the tester's project root, so the working directory does not matter
+SPAWN_KWARGS = {"close_fds": False}
+
+# Leading test number of a test case file name, e.g. "123_test_name.c" -> 123
+TEST_NUMBER_RE = re.compile(r"^(\d+)_")
+
+# Files in the test directory that are not test cases
+NON_TEST_FILES = {'std.c', 'std.h', 'minicrun.sh', 'readme.md'}
+
+@dataclass(slots=True)
 class TestResult:
     """Test result for a single test case and frontend"""
     test_name: str
@@ -30,37 +56,211 @@ class TestResult:
     output_matches_reference: bool
     exit_code_matches_reference: bool
     error_message: Optional[str] = None
+    # sha256 of the stripped program output, None if the IR was not run to completion
+    output_hash: Optional[bytes] = None
+    # Compiled, but --fail-fast stopped the run before its IR was run
+    runtime_skipped: bool = False
     # Backend-specific fields
     asm_generated: bool = False
     binary_compiled: bool = False
     backend_compile_time: float = 0.0
 
+class ProcessReaper:
+    """Wait for many subprocesses on one thread using pidfds
+    
+    Popen.wait(timeout) polls with sleeps in the calling thread; here a single thread
+    selects on a pidfd per child and kills children that pass their deadline.
+    """
+    
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        # pidfd -> [process, deadline, killed, future]
+        self._waiting = {}
+        self._wake_r, self._wake_w = os.pipe()
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        threading.Thread(target=self._loop, daemon=True).start()
+    
+    def wait(self, process: subprocess.Popen, timeout: float) -> Optional[int]:
+        """Return the exit code, or None if the process was killed after timeout seconds"""
+        return self.submit(process, timeout).result()
+    
+    def submit(self, process: subprocess.Popen, timeout: float) -> Future:
+        """Start watching process, return a future for what wait() would return"""
+        future = Future()
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except OSError:
+            # pidfds unsupported (Linux < 5.3): wait on a thread of its own
+            threading.Thread(target=lambda: future.set_result(self._wait_blocking(process, timeout)),
+                             daemon=True).start()
+            return future
+        
+        with self._lock:
+            self._waiting[pidfd] = [process, time.monotonic() + timeout, False, future]
+            self._selector.register(pidfd, selectors.EVENT_READ)
+        os.write(self._wake_w, b"\0")
+        return future
+    
+    def communicate(self, process: subprocess.Popen, timeout: float) -> Tuple[Optional[int], bytes]:
+        """Like wait(), also reading the process's piped stdout into memory"""
+        try:
+            # Opened before the reaper can collect the child, so it refers to this process
+            exited_fd = os.pidfd_open(process.pid)
+        except OSError:
+            exited_fd = None
+        future = self.submit(process, timeout)
+        
+        if exited_fd is None:
+            stdout = process.stdout.read()
+            process.stdout.close()
+            return future.result(), stdout
+        
+        fd = process.stdout.fileno()
+        chunks = []
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            selector.register(exited_fd, selectors.EVENT_READ)
+            while True:
+                ready = {key.fd for key, _ in selector.select()}
+                if fd in ready:
+                    data = os.read(fd, 65536)
+                    if not data:
+                        break
+                    chunks.append(data)
+                    continue
+                # Process exited or was killed: take what is buffered and stop, rather
+                # than wait for EOF from descendants that still hold the pipe
+                os.set_blocking(fd, False)
+                try:
+                    while data := os.read(fd, 65536):
+                        chunks.append(data)
+                except BlockingIOError:
+                    pass
+                break
+        os.close(exited_fd)
+        process.stdout.close()
+        return future.result(), b"".join(chunks)
+    
+    @staticmethod
+    def _wait_blocking(process: subprocess.Popen, timeout: float) -> Optional[int]:
+        try:
+            return process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            try:
+                process.wait(timeout=5)  # Give it 5 seconds to die
+            except subprocess.TimeoutExpired:
+                pass  # Process is really stuck, let it go
+            return None
+    
+    def _finish(self, pidfd: int, exit_code: Optional[int]) -> None:
+        with self._lock:
+            future = self._waiting.pop(pidfd)[3]
+            self._selector.unregister(pidfd)
+        os.close(pidfd)
+        future.set_result(exit_code)
+    
+    def _loop(self) -> None:
+        while True:
+            with self._lock:
+                deadlines = [entry[1] for entry in self._waiting.values()]
+            wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            
+            for key, _ in self._selector.select(wait_for):
+                if key.fd == self._wake_r:
+                    os.read(self._wake_r, 4096)
+                    continue
+                process, _, killed, _ = self._waiting[key.fd]
+                # The pidfd is readable once the child exited, so this does not block
+                exit_code = process.wait()
+                self._finish(key.fd, None if killed else exit_code)
+            
+            now = time.monotonic()
+            with self._lock:
+                expired = [(fd, entry) for fd, entry in self._waiting.items() if entry[1] <= now]
+            for fd, entry in expired:
+                if entry[2]:
+                    # Process is really stuck, let it go
+                    self._finish(fd, None)
+                    continue
+                # Force kill the process and give it 5 seconds to die
+                entry[0].kill()
+                entry[1], entry[2] = now + 5, True
+
+_reaper: Optional[ProcessReaper] = None
+_reaper_pid: Optional[int] = None
+
+def get_reaper() -> ProcessReaper:
+    """Return this process's reaper; forked pool workers do not inherit the parent's thread"""
+    global _reaper, _reaper_pid
+    if _reaper is None or _reaper_pid != os.getpid():
+        _reaper, _reaper_pid = ProcessReaper(), os.getpid()
+    return _reaper
+
 class FrontendTester:
     def __init__(self, project_root: str, timeout: int = 1, test_runtime: bool = True, frontends: List[str] = None, 
-                 include_for: bool = False, include_cfg: bool = False, backend_test: bool = False):
-        self.project_root = Path(project_root)
+                 include_for: bool = False, include_cfg: bool = False, backend_test: bool = False,
+                 run_dir: str = None, no_cache: bool = False, keep_logs: bool = False,
+                 fail_fast: bool = False, minic_path: str = None, ir_compiler_path: str = None,
+                 minic_signature: str = None):
+        # Absolute, since tools are launched without a working directory of their own
+        self.project_root = Path(project_root).absolute()
         self.timeout = timeout
         self.test_runtime = test_runtime
         self.frontends = frontends or ["flex_bison", "antlr4", "recursive_descent"]
         self.include_for = include_for
         self.include_cfg = include_cfg
+        self.no_cache = no_cache
+        self.keep_logs = keep_logs
+        self.fail_fast = fail_fast
+        # One reusable scratch log per thread instead of a new file per tool run
+        self._scratch = threading.local()
+        # IRCompiler runs per (IR hash, input hash), shared by the frontend threads
+        self._run_cache: Dict[Tuple[bytes, bytes], Future] = {}
+        self._run_cache_lock = threading.Lock()
+        self._indexed_tests = None
+        # .in file digest per test name, None for tests without input
+        self._input_digests: Dict[str, Optional[bytes]] = {}
+        self._frontend_pool: Optional[ThreadPoolExecutor] = None
+        # Moving average of each step's runtime, loaded on first use; new values are
+        # kept in _timing_updates until written back
+        self._timings: Optional[Dict[str, float]] = None
+        self._timing_updates: Dict[str, float] = {}
+        self._timings_lock = threading.Lock()
         
-        self.minic = self.project_root / "build" / "minic"
-        self.ir_compiler = self.project_root / "tools" / "IRCompiler" / "Linux-aarch64" / "Ubuntu-22.04" / "IRCompiler"
+        # Tool paths as plain strings, resolved and checked once by main()
+        self.minic = minic_path or str(self.project_root / "build" / "minic")
+        self.ir_compiler = ir_compiler_path or str(
+            self.project_root / "tools" / "IRCompiler" / "Linux-aarch64" / "Ubuntu-22.04" / "IRCompiler")
+        # minic build identity for the IR cache key, stat()ed once per run
+        self._minic_signature = minic_signature
         self.test_dir = self.project_root / "tests" / "commonclasstestcases" / "function"
         
         # Create temporary directory inside project
         self.temp_dir = self.project_root / "test_results"
-        self.temp_dir.mkdir(exist_ok=True)
+        # IR persists across runs, keyed by source, frontend and minic build
+        self.ir_cache_dir = self.temp_dir / "_ircache"
+        # Learned per-step runtimes persist across runs for adaptive timeouts
+        self.timings_file = self.temp_dir / "_timings.json"
+        self.timings_lock = self.temp_dir / "_timings.lock"
         
-        # Create subdirectories with timestamp
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        self.run_dir = self.temp_dir / f"run_{timestamp}"
+        if run_dir:
+            # Worker attached to an existing run: directories already created
+            self.run_dir = Path(run_dir)
+        else:
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            self.run_dir = self.temp_dir / f"run_{timestamp}"
         self.log_dir = self.run_dir / "logs"
         self.ir_dir = self.run_dir / "ir"
         self.output_dir = self.run_dir / "output"
         
+        if run_dir:
+            return
+        
         # Create subdirectories
+        self.temp_dir.mkdir(exist_ok=True)
+        self.ir_cache_dir.mkdir(exist_ok=True)
         self.run_dir.mkdir(exist_ok=True)
         self.log_dir.mkdir(exist_ok=True)
         self.ir_dir.mkdir(exist_ok=True)
@@ -79,15 +279,74 @@ class FrontendTester:
         """Cleanup temporary directory if requested"""
         # No automatic cleanup - let user decide
     
+    @staticmethod
+    def _open_outputs(stdout_file, stderr_file, capture_stdout: bool) -> Tuple:
+        """Open the stdout/stderr targets, sharing one handle when both name the same file
+        
+        Targets are file names or already open files; returns (stdout, stderr, handles to close).
+        """
+        opened = []
+        
+        def target(file):
+            if not file:
+                return subprocess.PIPE
+            if not isinstance(file, str):
+                return file
+            opened.append(open(file, 'w'))
+            return opened[-1]
+        
+        stdout_handle = target(stdout_file) if not capture_stdout else subprocess.PIPE
+        if stderr_file and stderr_file == stdout_file and not capture_stdout:
+            stderr_handle = subprocess.STDOUT
+        else:
+            stderr_handle = target(stderr_file)
+        return stdout_handle, stderr_handle, opened
+    
+    def _scratch_log(self):
+        """Return this thread's reusable log file, emptied
+        
+        Tool output lands here and is copied to a named log only when it is kept, so
+        passing tests create no log files.
+        """
+        scratch = getattr(self._scratch, "file", None)
+        if scratch is None:
+            scratch = self._scratch.file = tempfile.TemporaryFile(dir=self.run_dir)
+        scratch.seek(0)
+        scratch.truncate()
+        return scratch
+    
+    def _spill_log(self, scratch, log_file: Path, failed: bool) -> None:
+        """Copy scratch log contents to log_file if the step failed or logs are kept"""
+        if failed or self.keep_logs:
+            scratch.seek(0)
+            log_file.write_bytes(scratch.read())
+    
+    @staticmethod
+    def _wait(process: subprocess.Popen, timeout: int, start_ns: int, capture_stdout: bool) -> Tuple:
+        """Wait for process, reading its stdout first when captured"""
+        if capture_stdout:
+            exit_code, stdout = get_reaper().communicate(process, timeout)
+        else:
+            exit_code = get_reaper().wait(process, timeout)
+        # Monotonic integer clock; converted to seconds only here
+        elapsed = (time.perf_counter_ns() - start_ns) / 1e9
+        if exit_code is None:
+            exit_code = -999  # Special code for timeout
+        return (exit_code, elapsed, stdout) if capture_stdout else (exit_code, elapsed)
+    
     def run_with_timeout(self, cmd: List[str], timeout: int, 
                         stdout_file: Optional[str] = None, 
                         stderr_file: Optional[str] = None,
-                        env: Optional[dict] = None) -> Tuple[int, float]:
-        """Run command with timeout and return (exit_code, elapsed_time)"""
-        start_time = time.time()
+                        env: Optional[dict] = None,
+                        capture_stdout: bool = False) -> Tuple:
+        """Run command with timeout and return (exit_code, elapsed_time)
+        
+        With capture_stdout, stdout is kept in memory instead of written to stdout_file
+        and (exit_code, elapsed_time, stdout_bytes) is returned.
+        """
+        start_ns = time.perf_counter_ns()
         
-        stdout_handle = open(stdout_file, 'w') if stdout_file else subprocess.PIPE
-        stderr_handle = open(stderr_file, 'w') if stderr_file else subprocess.PIPE
+        stdout_handle, stderr_handle, opened = self._open_outputs(stdout_file, stderr_file, capture_stdout)
         
         try:
             # Use Popen for better control over process termination
@@ -95,39 +354,28 @@ class FrontendTester:
                 cmd,
                 stdout=stdout_handle,
                 stderr=stderr_handle,
-                cwd=self.project_root,
-                env=env or os.environ
+                env=env or os.environ,
+                **SPAWN_KWARGS
             )
             
-            try:
-                exit_code = process.wait(timeout=timeout)
-                elapsed = time.time() - start_time
-                return exit_code, elapsed
-            except subprocess.TimeoutExpired:
-                # Force kill the process and its children
-                process.kill()
-                try:
-                    process.wait(timeout=5)  # Give it 5 seconds to die
-                except subprocess.TimeoutExpired:
-                    pass  # Process is really stuck, let it go
-                elapsed = time.time() - start_time
-                return -999, elapsed  # Special code for timeout
+            return self._wait(process, timeout, start_ns, capture_stdout)
                 
         finally:
-            if stdout_file and stdout_handle != subprocess.PIPE:
-                stdout_handle.close()
-            if stderr_file and stderr_handle != subprocess.PIPE:
-                stderr_handle.close()
+            for handle in opened:
+                handle.close()
 
     def run_with_timeout_and_input(self, cmd: List[str], timeout: int, 
                                   input_file: str, 
                                   stdout_file: Optional[str] = None, 
-                                  stderr_file: Optional[str] = None) -> Tuple[int, float]:
-        """Run command with timeout and input file, return (exit_code, elapsed_time)"""
-        start_time = time.time()
+                                  stderr_file: Optional[str] = None,
+                                  capture_stdout: bool = False) -> Tuple:
+        """Run command with timeout and input file, return (exit_code, elapsed_time)
+        
+        capture_stdout works as for run_with_timeout.
+        """
+        start_ns = time.perf_counter_ns()
         
-        stdout_handle = open(stdout_file, 'w') if stdout_file else subprocess.PIPE
-        stderr_handle = open(stderr_file, 'w') if stderr_file else subprocess.PIPE
+        stdout_handle, stderr_handle, opened = self._open_outputs(stdout_file, stderr_file, capture_stdout)
         
         try:
             # Use Popen for better control over process termination
@@ -137,28 +385,14 @@ class FrontendTester:
                     stdin=input_handle,
                     stdout=stdout_handle,
                     stderr=stderr_handle,
-                    cwd=self.project_root
+                    **SPAWN_KWARGS
                 )
                 
-                try:
-                    exit_code = process.wait(timeout=timeout)
-                    elapsed = time.time() - start_time
-                    return exit_code, elapsed
-                except subprocess.TimeoutExpired:
-                    # Force kill the process and its children
-                    process.kill()
-                    try:
-                        process.wait(timeout=5)  # Give it 5 seconds to die
-                    except subprocess.TimeoutExpired:
-                        pass  # Process is really stuck, let it go
-                    elapsed = time.time() - start_time
-                    return -999, elapsed  # Special code for timeout
+                return self._wait(process, timeout, start_ns, capture_stdout)
                     
         finally:
-            if stdout_file and stdout_handle != subprocess.PIPE:
-                stdout_handle.close()
-            if stderr_file and stderr_handle != subprocess.PIPE:
-                stderr_handle.close()
+            for handle in opened:
+                handle.close()
     
     def compile_test(self, test_file: Path, frontend: str, test_name: str) -> TestResult:
         """Compile a test file with specified frontend"""
@@ -186,26 +420,46 @@ class FrontendTester:
         ir_file = self.ir_dir / f"{test_name}_{frontend}.ir"
         compile_log = self.log_dir / f"{test_name}_{frontend}_compile.log"
         
+        # Unchanged source and minic give the same IR
+        h = hashlib.sha256(test_file.read_bytes())
+        h.update(f"{self.minic_signature()}:{frontend}".encode())
+        cached_ir = self.ir_cache_dir / f"{h.hexdigest()}.ir"
+        if not self.no_cache and cached_ir.exists():
+            ir_file.unlink(missing_ok=True)
+            os.symlink(cached_ir, ir_file)
+            result.compile_success = True
+            result.ir_generated = True
+            return result
+        
         # Compile command
-        cmd = [str(self.minic), "-S", "-I"] + frontend_flag + [str(test_file), "-o", str(ir_file)]
+        cmd = [self.minic, "-S", "-I"] + frontend_flag + [str(test_file), "-o", str(ir_file)]
         
         # Set environment to disable debug output
         env = os.environ.copy()
         env['DEBUG'] = '0'  # Disable debug output
         
         # Run compilation (capture stderr for debugging, stdout usually empty for compilation)
-        exit_code, compile_time = self.run_with_timeout(
-            cmd, 
-            self.timeout,
-            stdout_file=str(compile_log),  # Compilation stdout is usually empty
-            stderr_file=str(compile_log),  # Capture errors and debug output
-            env=env
-        )
+        scratch = self._scratch_log()
+        (exit_code, compile_time), timeout = self._run_learned(
+            f"{test_name}_{frontend}_compile", h.hexdigest(),
+            lambda timeout: self.run_with_timeout(
+                cmd, 
+                timeout,
+                stdout_file=scratch,  # Compilation stdout is usually empty
+                stderr_file=scratch,  # Capture errors and debug output
+                env=env
+            ))
         
         result.compile_time = compile_time
+        # Check if IR file was generated; a missing file fails the stat
+        try:
+            ir_generated = exit_code == 0 and ir_file.stat().st_size > 0
+        except FileNotFoundError:
+            ir_generated = False
+        self._spill_log(scratch, compile_log, not ir_generated)
         
         if exit_code == -999:
-            result.error_message = f"Compilation timeout ({self.timeout}s)"
+            result.error_message = f"Compilation timeout ({timeout:g}s)"
             return result
         elif exit_code != 0:
             result.error_message = f"Compilation failed with exit code {exit_code}"
@@ -213,143 +467,314 @@ class FrontendTester:
         
         result.compile_success = True
         
-        # Check if IR file was generated
-        if ir_file.exists() and ir_file.stat().st_size > 0:
+        if ir_generated:
             result.ir_generated = True
         else:
             result.error_message = "IR file not generated or empty"
             return result
         
+        # Copy via a temp file and rename, so parallel readers never see partial files
+        fd, tmp_path = tempfile.mkstemp(dir=self.ir_cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(ir_file, tmp_path)
+            os.replace(tmp_path, cached_ir)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+        
         return result
     
-    def run_ir_test(self, ir_file: Path, test_name: str, frontend: str) -> Tuple[bool, float, Optional[str], int]:
-        """Run IR file and return (success, time, output, exit_code)"""
+    def _run_learned(self, timing_key: str, content_hash: str, run) -> Tuple[Tuple, float]:
+        """Call run(timeout) under a step's learned timeout, return (run's result, timeout used)
+        
+        run returns (exit_code, elapsed, ...). A step that outgrows its learned timeout is
+        retried once with the full --timeout, and every completed run updates the average,
+        so a step that got slower recovers instead of timing out for good.
+        """
+        timeout = self._timeout_for(timing_key, content_hash)
+        outcome = run(timeout)
+        if outcome[0] == -999 and timeout < self.timeout:
+            self._scratch_log()  # The retry logs from scratch
+            timeout = self.timeout
+            outcome = run(timeout)
+        if outcome[0] != -999:
+            self._record_timing(timing_key, content_hash, outcome[1])
+        return outcome, timeout
+    
+    def _timeout_for(self, timing_key: str, content_hash: str) -> float:
+        """Timeout for a step: 5x its learned runtime, at least 1s and at most --timeout
+        
+        Runtimes are only reused while the step's input (source or IR) is unchanged.
+        """
+        if self.no_cache:
+            return self.timeout
+        with self._timings_lock:
+            if self._timings is None:
+                try:
+                    self._timings = json.loads(self.timings_file.read_text())
+                except (OSError, ValueError):
+                    self._timings = {}
+            entry = self._timings.get(timing_key)
+        if not isinstance(entry, dict) or entry.get("hash") != content_hash:
+            return self.timeout
+        return min(self.timeout, max(1.0, 5 * entry["ema"]))
+    
+    def _record_timing(self, timing_key: str, content_hash: str, elapsed: float) -> None:
+        """Fold a finished step's runtime into its moving average, restarting it when the input changed"""
+        with self._timings_lock:
+            if self._timings is None:
+                return  # Learned timeouts are off
+            entry = self._timings.get(timing_key)
+            if isinstance(entry, dict) and entry.get("hash") == content_hash:
+                ema = 0.7 * entry["ema"] + 0.3 * elapsed
+            else:
+                ema = elapsed
+            self._timings[timing_key] = self._timing_updates[timing_key] = {"hash": content_hash, "ema": ema}
+    
+    def _flush_timings(self) -> None:
+        """Merge new averages into the timings file, serialized across parallel workers"""
+        with self._timings_lock:
+            updates, self._timing_updates = self._timing_updates, {}
+        if not updates:
+            return
+        with open(self.timings_lock, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                timings = json.loads(self.timings_file.read_text())
+            except (OSError, ValueError):
+                timings = {}
+            timings.update(updates)
+            fd, tmp_path = tempfile.mkstemp(dir=self.temp_dir, suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(timings, f)
+            os.replace(tmp_path, self.timings_file)
+    
+    def _input_digest(self, test_name: str) -> Optional[bytes]:
+        """sha256 of the test's .in file, None if it has none; read once per test"""
+        if test_name not in self._input_digests:
+            try:
+                digest = hashlib.sha256((self.test_dir / f"{test_name}.in").read_bytes()).digest()
+            except FileNotFoundError:
+                digest = None
+            self._input_digests[test_name] = digest
+        return self._input_digests[test_name]
+    
+    def run_ir_test(self, ir_file: Path, test_name: str, frontend: str) -> Tuple[bool, float, Optional[bytes], int, bytes]:
+        """Run IR file and return (success, time, output digest, exit_code, stderr)
+        
+        Frontends that produce byte-identical IR for the same input share one run.
+        """
+        key = (hashlib.sha256(ir_file.read_bytes()).digest(), self._input_digest(test_name) or b"")
+        content_hash = hashlib.sha256(key[0] + key[1]).hexdigest()
+        with self._run_cache_lock:
+            pending = self._run_cache.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._run_cache[key] = Future()
+        
+        output_file = self.output_dir / f"{test_name}_{frontend}.out"
+        if not owner:
+            run, owner_output_file = pending.result()
+            if run is None:
+                # The owner failed to run the IR at all: run it here
+                return self._run_ir_test(ir_file, test_name, frontend, content_hash)
+            shutil.copyfile(owner_output_file, output_file)
+            return run
+        
+        try:
+            run = self._run_ir_test(ir_file, test_name, frontend, content_hash)
+        except BaseException:
+            with self._run_cache_lock:
+                del self._run_cache[key]
+            pending.set_result((None, None))
+            raise
+        if run[3] == -999:
+            # Frontends already waiting share the timeout rather than each running
+            # out the clock again; later tests with this IR may retry, as timeouts
+            # can be transient
+            with self._run_cache_lock:
+                del self._run_cache[key]
+        pending.set_result((run, output_file))
+        return run
+    
+    def _run_ir_test(self, ir_file: Path, test_name: str, frontend: str,
+                     content_hash: str) -> Tuple[bool, float, Optional[bytes], int, bytes]:
+        """Run IR file and return (success, time, output digest, exit_code, stderr)
+        
+        stderr is returned rather than logged, since a mismatch is only known once
+        run_single_file has compared against the reference.
+        """
         output_file = self.output_dir / f"{test_name}_{frontend}.out"
-        runtime_log = self.log_dir / f"{test_name}_{frontend}_runtime.log"
         
         # Check for input file
         input_file = self.test_dir / f"{test_name}.in"
         
-        cmd = [str(self.ir_compiler), "-R", str(ir_file)]
+        cmd = [self.ir_compiler, "-R", str(ir_file)]
         
-        # Handle input file if it exists
-        if input_file.exists():
-            exit_code, runtime_time = self.run_with_timeout_and_input(
+        # Handle input file if it exists; stdout stays in memory for the comparison
+        scratch = self._scratch_log()
+        if self._input_digest(test_name) is not None:
+            run = lambda timeout: self.run_with_timeout_and_input(
                 cmd,
-                self.timeout,
+                timeout,
                 input_file=str(input_file),
-                stdout_file=str(output_file),
-                stderr_file=str(runtime_log)
+                stderr_file=scratch,
+                capture_stdout=True
             )
         else:
-            exit_code, runtime_time = self.run_with_timeout(
+            run = lambda timeout: self.run_with_timeout(
                 cmd,
-                self.timeout,
-                stdout_file=str(output_file),
-                stderr_file=str(runtime_log)
+                timeout,
+                stderr_file=scratch,
+                capture_stdout=True
             )
+        (exit_code, runtime_time, stdout), _ = self._run_learned(f"{test_name}_{frontend}_run", content_hash, run)
+        
+        # Keep the output file for inspection; it is not read back
+        output_file.write_bytes(stdout)
+        scratch.seek(0)
+        stderr = scratch.read()
         
         if exit_code == -999:
-            return False, runtime_time, "Runtime timeout", -999
+            return False, runtime_time, None, -999, stderr
         
-        # Read output
-        output = ""
-        if output_file.exists():
-            try:
-                output = output_file.read_text().strip()
-            except:
-                output = ""
+        # Outputs are only compared for equality, so compare sha256 digests
+        return True, runtime_time, hashlib.sha256(stdout.strip()).digest(), exit_code, stderr
+    
+    def _compile_one(self, test_file: Path, frontend: str, test_name: str) -> Tuple[TestResult, List[str]]:
+        """Compile with one frontend, return (result, log lines)"""
+        label = "flex+bison" if frontend == "flex_bison" else frontend
+        result = self.compile_test(test_file, frontend, test_name)
         
-        return True, runtime_time, output, exit_code
+        if result.compile_success:
+            return result, [f"  Compiling with {label}... OK ({result.compile_time:.2f}s)"]
+        return result, [f"  Compiling with {label}... FAILED ({result.error_message})"]
     
-    def test_single_file(self, test_file: Path) -> List[TestResult]:
-        """Test a single file with specified frontends"""
+    def _run_one(self, result: TestResult) -> Tuple[Optional[int], bytes, List[str]]:
+        """Run the IR of a compiled frontend, return (exit_code, stderr, log lines)
+
+        exit_code is None when the IR was not run.
+        """
+        if not (self.test_runtime and result.compile_success and result.ir_generated):
+            return None, b"", []
+        
+        test_name, frontend = result.test_name, result.frontend
+        ir_file = self.ir_dir / f"{test_name}_{frontend}.ir"
+        success, runtime_time, output_hash, exit_code, stderr = self.run_ir_test(ir_file, test_name, frontend)
+        result.runtime_success = success
+        result.runtime_time = runtime_time
+        result.output_hash = output_hash
+        
+        if frontend == "flex_bison":
+            return exit_code, stderr, []
+        # Check if input file exists and show info
+        has_input = self._input_digest(test_name) is not None
+        line = "    Running with input file..." if has_input else "    Running without input..."
+        if success:
+            return exit_code, stderr, [line + f" OK ({runtime_time:.2f}s)"]
+        return exit_code, stderr, [line + (" FAILED (Runtime timeout)" if exit_code == -999 else " FAILED")]
+    
+    def _frontend_threads(self) -> ThreadPoolExecutor:
+        """Thread pool for the frontends of a test; threads suffice since the work is
+        waiting on subprocesses"""
+        if self._frontend_pool is None:
+            # Kept for the tester's lifetime so each thread keeps its scratch log
+            self._frontend_pool = ThreadPoolExecutor(max_workers=len(self.frontends))
+        return self._frontend_pool
+    
+    def compile_single_file(self, test_file: Path) -> Tuple[List[TestResult], List[str]]:
+        """Compile a test file with all frontends concurrently, return (results, log lines)"""
         test_name = test_file.stem
+        log = [f"Testing {test_name}..."]
+        
+        futures = {frontend: self._frontend_threads().submit(self._compile_one, test_file, frontend, test_name)
+                   for frontend in self.frontends}
+        
+        # flex+bison is reported first since its output is the reference; the others
+        # keep their --frontends order so logs and results are the same on every run
         results = []
+        for frontend in sorted(self.frontends, key=lambda f: f != "flex_bison"):
+            result, lines = futures[frontend].result()
+            results.append(result)
+            log.extend(lines)
+        self._flush_timings()
+        return results, log
+    
+    def run_single_file(self, results: List[TestResult]) -> Tuple[List[TestResult], List[str]]:
+        """Run the IR of compiled frontends concurrently and compare against flex+bison
         
-        print(f"Testing {test_name}...")
+        results come from compile_single_file for one test; returns (results, log lines).
+        """
+        log = []
+        futures = [self._frontend_threads().submit(self._run_one, result) for result in results]
+        exit_codes = {}
+        stderrs = {}
+        for result, future in zip(results, futures):
+            exit_codes[result.frontend], stderrs[result.frontend], lines = future.result()
+            log.extend(lines)
         
+        self._settle(results, exit_codes, stderrs)
+        self._flush_timings()
+        return results, log
+    
+    def _settle(self, results: List[TestResult], exit_codes: Dict[str, Optional[int]],
+                stderrs: Dict[str, bytes]) -> None:
+        """Fill in the comparison fields of one test's results from its IR runs
+        
+        exit_codes[frontend] is None for frontends whose IR was not run.
+        """
         # Generate reference with flex+bison if it's in the test list
         reference_output = None
         reference_exit_code = None
-        
-        if "flex_bison" in self.frontends:
-            print(f"  Compiling with flex+bison...", end="", flush=True)
-            reference_result = self.compile_test(test_file, "flex_bison", test_name)
-            
-            if reference_result.compile_success:
-                print(f" OK ({reference_result.compile_time:.2f}s)")
-            else:
-                print(f" FAILED ({reference_result.error_message})")
-            
-            results.append(reference_result)
-            
-            if self.test_runtime and reference_result.compile_success and reference_result.ir_generated:
-                ir_file = self.ir_dir / f"{test_name}_flex_bison.ir"
-                success, runtime_time, output, exit_code = self.run_ir_test(ir_file, test_name, "flex_bison")
-                reference_result.runtime_success = success
-                reference_result.runtime_time = runtime_time
+        for reference_result in results:
+            if reference_result.frontend == "flex_bison" and exit_codes["flex_bison"] is not None:
                 reference_result.output_matches_reference = True  # Reference matches itself
                 reference_result.exit_code_matches_reference = True
-                
-                if success:
-                    reference_output = output
-                    reference_exit_code = exit_code
+                if reference_result.runtime_success:
+                    reference_output = reference_result.output_hash
+                    reference_exit_code = exit_codes["flex_bison"]
         
-        # Test other frontends
-        for frontend in self.frontends:
-            if frontend == "flex_bison":
-                continue  # Already tested above
-            
-            print(f"  Compiling with {frontend}...", end="", flush=True)
-            result = self.compile_test(test_file, frontend, test_name)
-            
-            if result.compile_success:
-                print(f" OK ({result.compile_time:.2f}s)")
-            else:
-                print(f" FAILED ({result.error_message})")
+        for result in results:
+            if result.frontend == "flex_bison":
+                continue
             
-            if self.test_runtime and result.compile_success and result.ir_generated:
-                # Check if input file exists and show info
-                input_file = self.test_dir / f"{test_name}.in"
-                has_input = input_file.exists()
-                if has_input:
-                    print(f"    Running with input file...", end="", flush=True)
-                else:
-                    print(f"    Running without input...", end="", flush=True)
-                
-                ir_file = self.ir_dir / f"{test_name}_{frontend}.ir"
-                success, runtime_time, output, exit_code = self.run_ir_test(ir_file, test_name, frontend)
-                result.runtime_success = success
-                result.runtime_time = runtime_time
-                
-                if success:
-                    print(f" OK ({runtime_time:.2f}s)")
-                else:
-                    print(f" FAILED (Runtime timeout)" if exit_code == -999 else f" FAILED")
-                
+            exit_code = exit_codes[result.frontend]
+            if exit_code is not None:
                 # Compare with reference if available
                 if reference_output is not None and reference_exit_code is not None:
-                    result.output_matches_reference = (output == reference_output)
+                    result.output_matches_reference = (result.output_hash == reference_output)
                     result.exit_code_matches_reference = (exit_code == reference_exit_code)
                 else:
                     # No reference available, mark as successful if runtime worked
-                    result.output_matches_reference = success
-                    result.exit_code_matches_reference = success
+                    result.output_matches_reference = result.runtime_success
+                    result.exit_code_matches_reference = result.runtime_success
             else:
                 # Not testing runtime
                 result.runtime_success = True
                 result.output_matches_reference = True
                 result.exit_code_matches_reference = True
-            
-            results.append(result)
         
-        return results
+        # Keep IRCompiler stderr for runs that failed or differ from the reference
+        for result in results:
+            if exit_codes[result.frontend] is None:
+                continue
+            failed = not (result.runtime_success and result.output_matches_reference
+                          and result.exit_code_matches_reference)
+            if failed or self.keep_logs:
+                runtime_log = self.log_dir / f"{result.test_name}_{result.frontend}_runtime.log"
+                runtime_log.write_bytes(stderrs[result.frontend])
+    
+    def test_single_file(self, test_file: Path) -> Tuple[List[TestResult], List[str]]:
+        """Test a single file with specified frontends, return (results, log lines)"""
+        results, log = self.compile_single_file(test_file)
+        results, run_log = self.run_single_file(results)
+        return results, log + run_log
     
     def run_tests(self, test_pattern: str = "*.c", max_tests: Optional[int] = None, max_test_number: Optional[int] = None) -> List[TestResult]:
         """Run tests on all matching files"""
-        test_files = list(self.test_dir.glob(test_pattern))
-        
         # Determine test number ranges based on enabled test types
         if max_test_number is None:
             max_test_number = 143  # Basic tests always included
@@ -359,54 +784,140 @@ class FrontendTester:
                 max_test_number = 160  # Include for tests (144-160)
         
         # Filter by test number and test type inclusion
-        filtered_files = []
-        for test_file in test_files:
-            # Skip non-test files
-            if test_file.name in ['std.c', 'std.h', 'minicrun.sh', 'readme.md']:
-                continue
-                
-            # Extract test number from filename (e.g., "123_test_name.c" -> 123)
-            try:
-                test_number = int(test_file.name.split('_')[0])
-                
-                # Check if this test should be included
-                include_test = False
-                if test_number <= 143:
-                    include_test = True  # Basic tests always included
-                elif 144 <= test_number <= 160 and self.include_for:
-                    include_test = True  # For tests
-                elif 161 <= test_number <= 162 and self.include_cfg:
-                    include_test = True  # CFG tests
-                
-                if include_test and test_number <= max_test_number:
-                    filtered_files.append(test_file)
-            except (ValueError, IndexError):
-                # Skip files that don't follow the naming convention
+        numbers, indexed = self._test_index()
+        test_files = []
+        for test_number, test_file in indexed[:bisect.bisect_right(numbers, max_test_number)]:
+            if not fnmatch.fnmatch(test_file.name, test_pattern):
                 continue
-        
-        test_files = sorted(filtered_files, key=lambda f: f.name)
+            if (test_number <= 143  # Basic tests always included
+                    or (144 <= test_number <= 160 and self.include_for)  # For tests
+                    or (161 <= test_number <= 162 and self.include_cfg)):  # CFG tests
+                test_files.append(test_file)
         
         if max_tests:
             test_files = test_files[:max_tests]
         
         print(f"Found {len(test_files)} test files")
         
+        # Phase 1 compiles every test, phase 2 runs the IR of those that compiled. Tests
+        # are independent and write to per-test file names, so each phase runs them in
+        # parallel; each worker prints its log in one piece when the test finishes
+        cpus = os.cpu_count() or 1
+        compiled, stopped = self._run_phase("Compiling", _compile_file_worker, test_files, cpus, self.fail_fast)
+        
         all_results = []
-        for i, test_file in enumerate(test_files, 1):
-            print(f"[{i}/{len(test_files)}] ", end="")
-            try:
-                start_time = time.time()
-                results = self.test_single_file(test_file)
-                elapsed = time.time() - start_time
-                print(f"  Total time: {elapsed:.2f}s")
+        to_run = []
+        for test_file in test_files:
+            results = compiled.get(test_file.stem)
+            if results is None:
+                continue
+            if stopped:
+                # --fail-fast stopped the run: report what compiled, run nothing
+                for result in results:
+                    result.runtime_skipped = self.test_runtime and result.ir_generated
                 all_results.extend(results)
+            elif self.test_runtime and any(r.ir_generated for r in results):
+                to_run.append(test_file)
+            else:
+                # Nothing to run; settled here without starting threads, since the
+                # run phase forks workers from this process
+                self._settle(results, dict.fromkeys(r.frontend for r in results), {})
+                all_results.extend(results)
+        
+        if to_run:
+            # IRCompiler runs mostly wait on I/O, so oversubscribe the cores
+            ran, _ = self._run_phase("Running", _run_file_worker, to_run, 2 * cpus, False,
+                                     {test_file.stem: compiled[test_file.stem] for test_file in to_run})
+            for results in ran.values():
+                all_results.extend(results)
+        
+        # Workers finish out of order; report in test order
+        order = {f.stem: i for i, f in enumerate(test_files)}
+        all_results.sort(key=lambda r: order[r.test_name])
+        return all_results
+    
+    def _run_phase(self, phase: str, worker, test_files: List[Path], max_workers: int,
+                   stop_on_compile_failure: bool,
+                   compiled: Optional[Dict[str, List[TestResult]]] = None) -> Tuple[Dict[str, List[TestResult]], bool]:
+        """Dispatch worker over test_files in a process pool
+        
+        Returns ({test_name: results}, whether a compile failure stopped the phase early).
+        """
+        print(f"{phase} {len(test_files)} test files")
+        finished = {}
+        reported = set()
+        
+        def report(future) -> Optional[List[TestResult]]:
+            """Print one finished test's log, return its results or None if the worker failed"""
+            reported.add(future)
+            i, test_file = len(reported), futures[future]
+            try:
+                results, log, elapsed = future.result()
+            except Exception as e:
+                print(f"[{i}/{len(test_files)}] ERROR testing {test_file.name}: {e}")
+                return None
+            print(f"[{i}/{len(test_files)}] " + "\n".join(log))
+            print(f"  Total time: {elapsed:.2f}s")
+            finished[test_file.stem] = results
+            return results
+        
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=POOL_CONTEXT) as executor:
+            futures = {}
+            for test_file in test_files:
+                extra = (compiled[test_file.stem],) if compiled is not None else ()
+                futures[executor.submit(worker, self._worker_args(), test_file, *extra)] = test_file
+            try:
+                for future in as_completed(futures):
+                    results = report(future)
+                    if stop_on_compile_failure and results is not None and not all(r.compile_success for r in results):
+                        print(f"Compilation failed in {futures[future].name}, cancelling pending tests")
+                        # Waits for the tests already running; their results are kept
+                        executor.shutdown(cancel_futures=True)
+                        for pending in futures:
+                            if pending not in reported and not pending.cancelled():
+                                report(pending)
+                        cancelled = sum(pending.cancelled() for pending in futures)
+                        print(f"Cancelled {cancelled} of {len(test_files)} test files")
+                        return finished, True
             except KeyboardInterrupt:
-                print(f"Interrupted at {test_file.name}")
+                print("Interrupted, cancelling pending tests")
+                executor.shutdown(wait=False, cancel_futures=True)
                 raise
-            except Exception as e:
-                print(f"ERROR testing {test_file.name}: {e}")
+        return finished, False
+    
+    def _test_index(self) -> Tuple[List[int], List[Tuple[int, Path]]]:
+        """Numbered files in the test directory sorted by number, built on first use
         
-        return all_results
+        Returns (numbers, [(number, path)]) with numbers parallel to the list for bisecting.
+        """
+        if self._indexed_tests is None:
+            indexed = []
+            with os.scandir(self.test_dir) as it:
+                for entry in it:
+                    match = TEST_NUMBER_RE.match(entry.name)
+                    if match and entry.name not in NON_TEST_FILES:
+                        indexed.append((int(match.group(1)), entry.name, entry.path))
+            indexed.sort(key=itemgetter(0, 1))
+            indexed = [(number, Path(path)) for number, _, path in indexed]
+            self._indexed_tests = ([n for n, _ in indexed], indexed)
+        return self._indexed_tests
+    
+    def _worker_args(self) -> Dict:
+        """Plain keyword arguments for rebuilding this tester inside a pool worker"""
+        return {"project_root": str(self.project_root), "timeout": self.timeout,
+                "test_runtime": self.test_runtime, "frontends": self.frontends,
+                "include_for": self.include_for, "include_cfg": self.include_cfg,
+                "run_dir": str(self.run_dir), "no_cache": self.no_cache,
+                "keep_logs": self.keep_logs, "fail_fast": self.fail_fast,
+                "minic_path": self.minic, "ir_compiler_path": self.ir_compiler,
+                "minic_signature": self.minic_signature()}
+    
+    def minic_signature(self) -> str:
+        """mtime and size of the minic binary; a rebuild changes it"""
+        if self._minic_signature is None:
+            minic_stat = os.stat(self.minic)
+            self._minic_signature = f"{minic_stat.st_mtime_ns}:{minic_stat.st_size}"
+        return self._minic_signature
     
     def print_summary(self, results: List[TestResult]):
         """Print test summary"""
@@ -414,36 +925,52 @@ class FrontendTester:
         print("TEST SUMMARY")
         print("="*80)
         
+        # Tally every metric and collect failures in a single pass
+        counts = defaultdict(Counter)
+        failures = []
+        for r in results:
+            c = counts[r.frontend]
+            c["total"] += 1
+            c["compile"] += r.compile_success
+            c["ir"] += r.ir_generated
+            c["runtime"] += r.runtime_success
+            c["output"] += r.output_matches_reference
+            c["exit"] += r.exit_code_matches_reference
+            c["skipped"] += r.runtime_skipped
+            passed = r.compile_success and r.ir_generated
+            if self.test_runtime and not r.runtime_skipped:
+                passed = (passed and r.runtime_success and r.output_matches_reference
+                          and r.exit_code_matches_reference)
+            if not passed:
+                failures.append(r)
+        
         for frontend in self.frontends:
-            frontend_results = [r for r in results if r.frontend == frontend]
-            if not frontend_results:
+            c = counts.get(frontend)
+            if not c:
                 continue
                 
-            total = len(frontend_results)
-            compile_success = len([r for r in frontend_results if r.compile_success])
-            ir_generated = len([r for r in frontend_results if r.ir_generated])
+            total = c["total"]
+            compile_success = c["compile"]
+            ir_generated = c["ir"]
             
             print(f"\n{frontend.upper()}:")
             print(f"  Compilation success: {compile_success}/{total} ({100*compile_success/total:.1f}%)")
             print(f"  IR generated:        {ir_generated}/{total} ({100*ir_generated/total:.1f}%)")
             
             if self.test_runtime:
-                runtime_success = len([r for r in frontend_results if r.runtime_success])
-                output_matches = len([r for r in frontend_results if r.output_matches_reference])
-                exit_code_matches = len([r for r in frontend_results if r.exit_code_matches_reference])
+                runtime_success = c["runtime"]
+                output_matches = c["output"]
+                exit_code_matches = c["exit"]
                 
                 print(f"  Runtime success:     {runtime_success}/{total} ({100*runtime_success/total:.1f}%)")
+                if c["skipped"]:
+                    print(f"  Runtime skipped:     {c['skipped']}/{total} (--fail-fast)")
                 if frontend != "flex_bison" and "flex_bison" in self.frontends:  # Don't compare reference with itself
                     print(f"  Output matches ref:  {output_matches}/{total} ({100*output_matches/total:.1f}%)")
                     print(f"  Exit code matches:   {exit_code_matches}/{total} ({100*exit_code_matches/total:.1f}%)")
         
         # Show failures
         print(f"\nFAILURES:")
-        if self.test_runtime:
-            failures = [r for r in results if not (r.compile_success and r.ir_generated and r.runtime_success and r.output_matches_reference and r.exit_code_matches_reference)]
-        else:
-            failures = [r for r in results if not (r.compile_success and r.ir_generated)]
-        
         if failures:
             for result in failures:
                 print(f"  {result.test_name} ({result.frontend}): {result.error_message or 'Output/exit code mismatch'}")
@@ -456,7 +983,37 @@ class FrontendTester:
         if self.test_runtime:
             print(f"Output files: {self.output_dir}")
 
+# Tester kept resident in each pool worker, with the arguments it was built from
+_worker_tester: Optional[FrontendTester] = None
+_worker_tester_args: Optional[Dict] = None
+
+def _resident_tester(tester_args: Dict) -> FrontendTester:
+    """Tester attached to an existing run, reused for every test the worker receives
+    
+    Its frontend threads, scratch logs and run memo carry over between tests.
+    """
+    global _worker_tester, _worker_tester_args
+    if _worker_tester is None or _worker_tester_args != tester_args:
+        _worker_tester, _worker_tester_args = FrontendTester(**tester_args), tester_args
+    return _worker_tester
+
+def _compile_file_worker(tester_args: Dict, test_file: Path) -> Tuple[List[TestResult], List[str], float]:
+    """Process pool entry point: compile one file with every frontend"""
+    start_ns = time.perf_counter_ns()
+    results, log = _resident_tester(tester_args).compile_single_file(test_file)
+    return results, log, (time.perf_counter_ns() - start_ns) / 1e9
+
+def _run_file_worker(tester_args: Dict, test_file: Path,
+                     results: List[TestResult]) -> Tuple[List[TestResult], List[str], float]:
+    """Process pool entry point: run and compare the compiled IR of one file"""
+    start_ns = time.perf_counter_ns()
+    results, log = _resident_tester(tester_args).run_single_file(results)
+    return results, [f"Running {test_file.stem}..."] + log, (time.perf_counter_ns() - start_ns) / 1e9
+
 def main():
+    # Only the command line needs argparse; pool workers never import it
+    import argparse
+    
     parser = argparse.ArgumentParser(description="Test minic frontend implementations")
     
     # Testing configuration
@@ -466,6 +1023,8 @@ def main():
                        help="Which frontends to test")
     parser.add_argument("--compile-only", action="store_true", 
                        help="Only test compilation, skip runtime testing")
+    parser.add_argument("--fail-fast", action="store_true",
+                       help="Stop testing after the first compilation failure")
     parser.add_argument("--include-for", action="store_true",
                        help="Include for loop tests (144-160)")
     parser.add_argument("--include-cfg", action="store_true", 
@@ -483,7 +1042,13 @@ def main():
     
     # Performance options
     parser.add_argument("--timeout", type=int, default=15, 
-                       help="Timeout for each compilation/execution (seconds)")
+                       help="Timeout for each compilation/execution (seconds); steps with a learned "
+                            "runtime use 5x that, at least 1s")
+    
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Ignore IR cached and runtimes learned by earlier runs")
+    parser.add_argument("--keep-logs", action="store_true",
+                       help="Write tool logs for passing steps too (default: failures only)")
     
     # Output options
     parser.add_argument("--verbose", "-v", action="store_true",
@@ -507,6 +1072,7 @@ def main():
         sys.exit(1)
 
     test_runtime = not args.compile_only
+    ir_compiler = None
     if test_runtime:
         ir_compiler = project_root / "tools" / "IRCompiler" / "Linux-aarch64" / "Ubuntu-22.04" / "IRCompiler"
         if not ir_compiler.exists():
@@ -521,7 +1087,12 @@ def main():
         test_runtime=test_runtime,
         frontends=args.frontends,
         include_for=args.include_for,
-        include_cfg=args.include_cfg
+        include_cfg=args.include_cfg,
+        no_cache=args.no_cache,
+        keep_logs=args.keep_logs,
+        fail_fast=args.fail_fast,
+        minic_path=str(minic),
+        ir_compiler_path=str(ir_compiler) if ir_compiler else None
     )
     
     try:
@@ -531,8 +1102,11 @@ def main():
             all_results = []
             for test_file in test_files:
                 if test_file.exists():
-                    results = tester.test_single_file(test_file)
+                    results, log = tester.test_single_file(test_file)
+                    print("\n".join(log))
                     all_results.extend(results)
+                    if args.fail_fast and not all(r.compile_success for r in results):
+                        break
                 else:
                     print(f"WARNING: Test file not found: {test_file}")
         else: